@@ -45,6 +45,12 @@ class ReplServer(Server):
             if hasattr(tool, 'initialize'):
                 await tool.initialize()
 
+    async def cleanup(self):
+        """Release resources held by tools (e.g. pooled shells)"""
+        for tool in self.tools.values():
+            if hasattr(tool, 'close'):
+                await tool.close()
+
 
 async def main():
     """Create and run the server using stdin/stdout streams"""
@@ -70,16 +76,19 @@ async def main():
 
         return await tool.execute(arguments)
 
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="repl",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="repl",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        await server.cleanup()
@@ -41,6 +41,8 @@ class BaseTool(ABC):
 class CodeOutput:
     """Capture code execution output"""
 
+    __slots__ = ("execution_time", "stdout", "stderr", "result")
+
     def __init__(self):
         self.execution_time = 0.0
         self.stdout = ""
@@ -1,9 +1,11 @@
 import asyncio
 import logging
 import mcp.types as types
+from types import MappingProxyType
 from typing import List
 
 from repl.tools import ShellTool
+from repl.tools.shell_tool import OutputBuffer, ShellTask
 from repl.tools.base import BaseTool
 
 # Configure logging
@@ -18,6 +20,7 @@ class ShellStatusTool(BaseTool):
        - If task is still running, waits up to 5 seconds for completion
        - Checks status every 100ms
        - Returns latest status even if task isn't finished
+       - Output captured so far is included while the task is running
        - Can be called multiple times on the same task
     
     2. Status Values:
@@ -39,7 +42,18 @@ class ShellStatusTool(BaseTool):
        
        Return Value:
        0
+
+       Next offset: 42
+       Next stderr offset: 0
+       ETag: completed:42:0
        ```
+
+    4. Incremental Output:
+       - Pass the previous "Next offset" as since_offset (and "Next stderr
+         offset" as stderr_since_offset) to receive only new output
+       - Offsets are byte positions and stay valid after old output is trimmed
+       - Pass the previous "ETag" as if_none_match to get just "unchanged"
+         when neither status nor output has moved on
     
     # Best Practices
     1. Status Checking:
@@ -66,7 +80,8 @@ class ShellStatusTool(BaseTool):
        ```
     
     3. Task Lifecycle:
-       - Task IDs remain valid until server restart
+       - Task IDs remain valid until server restart, except that only the
+         256 most recently used finished tasks are kept
        - Can check old tasks' status and output
        - Failed tasks include error details in stderr
     
@@ -78,31 +93,39 @@ class ShellStatusTool(BaseTool):
 
     MAX_WAIT = 4.9  # Maximum time to wait for task completion
 
-    def __init__(self, shell_tool: ShellTool):
-        self.shell_tool = shell_tool
-
-    @property
-    def name(self) -> str:
-        return "shell_status"
+    name = "shell_status"
 
-    @property
-    def description(self) -> str:
-        return """Check the status of a shell command that switched to async mode.
+    description = """Check the status of a shell command that switched to async mode.
 Provide the task ID that was returned by the shell command.
 Will wait up to 5 seconds for task completion."""
 
-    @property
-    def schema(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "task_id": {
-                    "type": "string",
-                    "description": "Task ID from shell command"
-                }
+    schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "task_id": {
+                "type": "string",
+                "description": "Task ID from shell command"
+            },
+            "since_offset": {
+                "type": "integer",
+                "description": "Only return stdout after this offset (the 'Next offset' of a previous check)",
+                "default": 0
             },
-            "required": ["task_id"]
-        }
+            "stderr_since_offset": {
+                "type": "integer",
+                "description": "Only return stderr after this offset (the 'Next stderr offset' of a previous check)",
+                "default": 0
+            },
+            "if_none_match": {
+                "type": "string",
+                "description": "ETag from a previous check; the reply is just 'unchanged' if nothing has changed since"
+            }
+        },
+        "required": ["task_id"]
+    })
+
+    def __init__(self, shell_tool: ShellTool):
+        self.shell_tool = shell_tool
 
     async def execute(self, arguments: dict) -> List[types.TextContent]:
         task_id = arguments.get("task_id")
@@ -112,34 +135,64 @@ Will wait up to 5 seconds for task completion."""
         if task_id not in self.shell_tool.tasks:
             raise ValueError(f"Task {task_id} not found")
 
+        since_offset = arguments.get("since_offset", 0)
+        stderr_since_offset = arguments.get("stderr_since_offset", 0)
+        for key, value in (("since_offset", since_offset), ("stderr_since_offset", stderr_since_offset)):
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                raise ValueError(f"{key} must be a non-negative integer")
+
         task = self.shell_tool.tasks[task_id]
-        logger.debug(f"Checking status of task {task_id}: {task.status}")
+        self.shell_tool.tasks.move_to_end(task_id)
+        logger.debug("Checking status of task %s: %s", task_id, task.status)
 
-        # If task isn't completed yet, wait up to MAX_WAIT seconds
+        # Finished tasks are answered straight away; only running ones wait up to MAX_WAIT seconds
         if task.status == "running":
             try:
-                start_time = asyncio.get_event_loop().time()
-                while (asyncio.get_event_loop().time() - start_time) < self.MAX_WAIT:
-                    if task.status != "running":
-                        break
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + self.MAX_WAIT
+                while task.status == "running" and loop.time() < deadline:
                     await asyncio.sleep(0.1)  # Check every 100ms
             except Exception as e:
-                logger.error(f"Error while waiting for task completion: {e}")
+                logger.error("Error while waiting for task completion: %s", e)
 
-        # Now format the response
-        status_text = f"Status: {task.status}\n"
-        if task.execution_time:
-            status_text += f"Execution time: {task.execution_time:.4f} seconds\n"
-        else:
-            status_text += f"Running time: {task.running_time:.4f} seconds\n"
-        if task.stdout:
-            status_text += f"\nStandard Output:\n{task.stdout}\n"
-        if task.stderr:
-            status_text += f"\nStandard Error:\n{task.stderr}\n"
-        if task.result is not None:
-            status_text += f"\nReturn Value:\n{task.result}"
+        tag = self.etag(task)
+        if tag == arguments.get("if_none_match"):
+            return [types.TextContent(type="text", text="unchanged")]
 
         return [types.TextContent(
             type="text",
-            text=status_text
+            text=f"{self.format_status(task, since_offset, stderr_since_offset)}\nETag: {tag}"
         )]
+
+    @staticmethod
+    def etag(task: ShellTask) -> str:
+        """Token that changes whenever the task's status or output changes"""
+        return f"{task.status}:{task.stdout_buf.end_offset}:{task.stderr_buf.end_offset}"
+
+    @staticmethod
+    def _read_output(task: ShellTask, stream: str, offset: int) -> tuple[str, int]:
+        """Return (text, next_offset) for "stdout" or "stderr", reusing the cached decode when nothing is skipped"""
+        buf: OutputBuffer = getattr(task, f"{stream}_buf")
+        if offset or not task.finished:
+            return buf.read_since(offset, complete_only=not task.finished)
+        return getattr(task, stream), buf.end_offset
+
+    @classmethod
+    def format_status(cls, task: ShellTask, since_offset: int = 0, stderr_since_offset: int = 0) -> str:
+        """Render the current state of a task as the shell_status response text"""
+        stdout, next_offset = cls._read_output(task, "stdout", since_offset)
+        stderr, next_stderr_offset = cls._read_output(task, "stderr", stderr_since_offset)
+
+        parts: List[str] = [f"Status: {task.status}\n"]
+        if task.execution_time:
+            parts.append(f"Execution time: {task.execution_time:.4f} seconds\n")
+        else:
+            parts.append(f"Running time: {task.running_time:.4f} seconds\n")
+        if stdout:
+            parts.append(f"\nStandard Output:\n{stdout}\n")
+        if stderr:
+            parts.append(f"\nStandard Error:\n{stderr}\n")
+        if task.result is not None:
+            parts.append(f"\nReturn Value:\n{task.result}\n")
+        parts.append(f"\nNext offset: {next_offset}\nNext stderr offset: {next_stderr_offset}")
+        return "".join(parts)
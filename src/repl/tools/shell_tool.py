@@ -1,40 +1,374 @@
 import time
 
 import asyncio
+import itertools
 import logging
 import mcp.types as types
 import os
 import pathlib
-import uuid
-from typing import List, Dict, Optional
+import re
+import secrets
+import shlex
+import shutil
+import sys
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import List, Optional
 
 from repl.tools.base import BaseTool, CodeOutput
 
 # Configure logging
 logger = logging.getLogger('shell_tool')
 
+READ_CHUNK_SIZE = 64 * 1024  # Bytes read from a pipe per drain iteration
+MAX_OUTPUT_SIZE = 10 * 1024 * 1024  # Per-stream cap; oldest output is dropped beyond this
+DEFAULT_WORKING_DIR = str(pathlib.Path.home())  # Resolved once at import
+
+
+# Event loop the PidfdChildWatcher was attached to, if one was installed
+_child_watcher_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _ensure_child_watcher() -> None:
+    """Install a PidfdChildWatcher for the running loop on Linux / Python 3.11"""
+    global _child_watcher_loop
+    loop = asyncio.get_running_loop()
+    if loop is _child_watcher_loop:
+        return
+    _child_watcher_loop = loop
+    # 3.12+ picks pidfd automatically and deprecates set_child_watcher
+    if sys.platform != "linux" or sys.version_info >= (3, 12) or not hasattr(asyncio, "PidfdChildWatcher"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except (AttributeError, OSError):
+        logger.debug("pidfd_open unavailable, keeping default child watcher")
+        return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(loop)
+    asyncio.set_child_watcher(watcher)
+    logger.debug("Installed PidfdChildWatcher")
+
+
+# (shell name, PATH) -> resolved executable path, so PATH is searched once per shell
+# and searched again if PATH changes (python_session can modify os.environ)
+_shell_paths: dict[tuple[str, Optional[str]], str] = {}
+
+
+def _resolve_shell(shell: str) -> str:
+    """Resolve a shell name to its full path, falling back to the bare name"""
+    key = (shell, os.environ.get("PATH"))
+    path = _shell_paths.get(key)
+    if path is None:
+        path = _shell_paths[key] = shutil.which(shell) or shell
+    return path
+
+
+async def _spawn_shell(shell: str, working_dir: str, *args: str, **kwargs) -> asyncio.subprocess.Process:
+    """Start shell in working_dir, letting the kernel's chdir double as the existence check"""
+    try:
+        # argv[0] stays the bare shell name so $0 matches a PATH lookup
+        return await asyncio.create_subprocess_exec(
+            shell, *args, executable=_resolve_shell(shell), cwd=working_dir, **kwargs
+        )
+    except FileNotFoundError as e:
+        if e.filename == working_dir:
+            raise ValueError(f"Working directory does not exist: {working_dir}") from e
+        raise
+
+
+class OutputBuffer(bytearray):
+    """Captured stream output that remembers how many leading bytes were trimmed.
+
+    Offsets handed to clients are absolute (dropped + index), so they stay valid
+    after the oldest output has been discarded.
+    """
+
+    dropped = 0
+
+    @property
+    def end_offset(self) -> int:
+        return self.dropped + len(self)
+
+    def write(self, chunk: bytes, limit: int = MAX_OUTPUT_SIZE) -> None:
+        """Add chunk, dropping the oldest bytes beyond limit"""
+        self.extend(chunk)
+        excess = len(self) - limit
+        if excess > 0:
+            del self[:excess]
+            self.dropped += excess
+
+    def read_since(self, offset: int, complete_only: bool = False) -> tuple[str, int]:
+        """Decode output from an absolute offset, returning (text, next_offset).
+
+        With complete_only, a trailing partial UTF-8 sequence is held back so a
+        character split across reads is not garbled between polls.
+        """
+        start = min(max(offset - self.dropped, 0), len(self))
+        # Slicing copies, so data is a stable snapshot even if a drain task extends
+        # the buffer later; no lock is needed as readers never await mid-read.
+        data = self[start:]
+        if complete_only:
+            data = data[:_complete_utf8_length(data)]
+        return data.decode("utf-8", errors="replace"), self.dropped + start + len(data)
+
+
+def _complete_utf8_length(data: bytes) -> int:
+    """Length of data excluding a trailing incomplete UTF-8 sequence"""
+    end = len(data)
+    for back in range(1, min(4, end) + 1):
+        byte = data[end - back]
+        if byte & 0xC0 != 0x80:
+            # ASCII or lead byte: work out how long its sequence should be
+            needed = 1 if byte < 0x80 else 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return end if back >= needed else end - back
+    return end
+
+
+async def _drain(stream: asyncio.StreamReader, buf: OutputBuffer) -> None:
+    """Append everything read from stream to buf until EOF"""
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buf.write(chunk)
+
+
+async def _drain_until(stream: asyncio.StreamReader, buf: OutputBuffer, marker: bytes) -> bytes:
+    """Append stream to buf up to marker, returning whatever was read after it"""
+    pending = b""
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            raise ConnectionError("Pooled shell exited before the command finished")
+        pending += chunk
+        index = pending.find(marker)
+        if index >= 0:
+            buf.write(pending[:index])
+            return pending[index + len(marker):]
+        # Hold back only a tail that could be the start of a marker split across reads
+        held = next((n for n in range(min(len(marker) - 1, len(pending)), 0, -1)
+                     if pending.endswith(marker[:n])), 0)
+        buf.write(pending[:len(pending) - held])
+        pending = pending[len(pending) - held:]
+
 
 class ShellTask:
-    def __init__(self, command: str, shell: str, working_dir: str):
-        self.id = str(uuid.uuid4())
+    __slots__ = (
+        "id", "command", "shell", "working_dir", "merge_stderr", "process", "status", "stdout_buf",
+        "stderr_buf", "_stdout", "_stderr", "result", "execution_time", "start_time",
+    )
+
+    _id_counter = itertools.count(1)  # IDs only need to be unique within this server process
+
+    def __init__(self, command: str, shell: str, working_dir: str, merge_stderr: bool = False):
+        self.id = f"t{next(ShellTask._id_counter):x}"
         self.command = command
         self.shell = shell
         self.working_dir = working_dir
+        self.merge_stderr = merge_stderr  # Route stderr into stdout through a single pipe
         self.process: Optional[asyncio.subprocess.Process] = None
         self.status = "pending"  # pending, running, completed, failed
-        self.stdout = ""
-        self.stderr = ""
+        self.stdout_buf = OutputBuffer()
+        self.stderr_buf = OutputBuffer()
+        self._stdout: Optional[str] = None  # Decoded once the task has finished
+        self._stderr: Optional[str] = None
         self.result = None
         self.execution_time = None
         self.start_time = None
 
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def stdout(self) -> str:
+        if self._stdout is not None:
+            return self._stdout
+        text = self.stdout_buf.decode("utf-8", errors="replace")
+        if self.finished:
+            self._stdout = text
+        return text
+
+    @property
+    def stderr(self) -> str:
+        if self._stderr is not None:
+            return self._stderr
+        text = self.stderr_buf.decode("utf-8", errors="replace")
+        if self.finished:
+            self._stderr = text
+        return text
+
     @property
     def running_time(self) -> float:
-        if self.start_time:
-            return time.time() - self.start_time
+        if self.start_time is not None:
+            return time.monotonic() - self.start_time
         return 0.0
 
 
+class ShellPool:
+    """Long-lived shell processes reused to skip fork+exec of a new shell per command.
+
+    Idle shells are kept per (shell, absolute working_dir) and dropped whenever
+    os.environ has changed since they were spawned (python_session can modify
+    it in-process), so pooled commands see the same environment a fresh shell
+    would. Checking this hashes os.environ on every pooled command, a cost
+    accepted for that correctness.
+
+    A command is sent to the shell's stdin as
+    `( cd -- '<working_dir>' && eval '<command>' ) </dev/null`, so syntax
+    errors, cd/export and other state changes stay inside the subshell. The cd
+    re-resolves a directory replaced since the shell started, and a deleted one
+    fails there with the shell's own cd error rather than a separate stat.
+    Completion is detected by a per-command marker written to both pipes, with
+    the exit status following the marker on stdout.
+    """
+
+    MAX_IDLE = 8  # Idle shells kept across all keys; extras are closed
+
+    # Commands that can reach past the ( ... ) subshell: signalling other processes
+    # (possibly the pooled shell), naming the pooled shell's PID, or leaving
+    # background processes attached to its pipes. exec/exit/trap/wait are fine,
+    # as they only affect the subshell.
+    UNSAFE_PATTERN = re.compile(
+        r"\b(?:kill|pkill|killall|nohup|setsid|disown)\b|\$\$|\$\{?PPID\b|(?<![&<>|])&(?![&>])"
+    )
+
+    def __init__(self):
+        self._idle: dict[tuple[str, str], list[asyncio.subprocess.Process]] = {}
+        self._environ = self._environ_fingerprint()  # Environment the idle shells inherited
+
+    @staticmethod
+    def _environ_fingerprint() -> int:
+        return hash(frozenset(os.environ.items()))
+
+    def _drop_idle(self) -> None:
+        """Close all idle shells; they exit on EOF"""
+        for processes in self._idle.values():
+            for process in processes:
+                if process.returncode is None:
+                    process.stdin.close()
+        self._idle.clear()
+
+    @classmethod
+    def accepts(cls, command: str) -> bool:
+        """Whether command can safely run in a pooled shell"""
+        return cls.UNSAFE_PATTERN.search(command) is None
+
+    async def _acquire(self, shell: str, working_dir: str) -> asyncio.subprocess.Process:
+        environ = self._environ_fingerprint()
+        if environ != self._environ:
+            logger.debug("Environment changed, dropping idle pooled shells")
+            self._drop_idle()
+            self._environ = environ
+        idle = self._idle.get((shell, working_dir))
+        while idle:
+            process = idle.pop()
+            if process.returncode is None:
+                return process
+        logger.debug("Starting pooled %s shell in %s", shell, working_dir)
+        return await _spawn_shell(
+            shell,
+            working_dir,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+    def _release(self, shell: str, working_dir: str, process: asyncio.subprocess.Process) -> None:
+        if sum(len(idle) for idle in self._idle.values()) >= self.MAX_IDLE:
+            process.stdin.close()  # The shell exits on EOF
+            return
+        self._idle.setdefault((shell, working_dir), []).append(process)
+
+    async def close(self) -> None:
+        """Shut down all idle shells and wait for them to exit"""
+        idle = [process for processes in self._idle.values() for process in processes]
+        self._drop_idle()
+        await asyncio.gather(*(process.wait() for process in idle))
+
+    async def run(self, task: ShellTask) -> int:
+        """Run task.command in a pooled shell, streaming into the task buffers; returns the exit status"""
+        process = await self._acquire(task.shell, task.working_dir)
+        task.process = process
+        marker = f"__REPL_DONE_{secrets.token_hex(8)}__"
+        redirect = " 2>&1" if task.merge_stderr else ""
+        script = (
+            f"( cd -- {shlex.quote(task.working_dir)} && eval {shlex.quote(task.command)} ) </dev/null{redirect}; "
+            f"printf '{marker}%d\\n' \"$?\"; printf '{marker}' >&2\n"
+        )
+        returncode = None
+        try:
+            process.stdin.write(script.encode("utf-8"))
+            await process.stdin.drain()
+            rest, _ = await asyncio.gather(
+                _drain_until(process.stdout, task.stdout_buf, marker.encode()),
+                _drain_until(process.stderr, task.stderr_buf, marker.encode()),
+            )
+            while not rest.endswith(b"\n"):
+                chunk = await process.stdout.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    raise ConnectionError("Pooled shell exited before reporting an exit status")
+                rest += chunk
+            returncode = int(rest)
+            return returncode
+        finally:
+            if returncode is not None:
+                self._release(task.shell, task.working_dir, process)
+            elif process.returncode is None:
+                process.kill()
+
+
+class CommandCache:
+    """Opt-in memo of (shell, working_dir, command, merge_stderr) -> output for idempotent commands.
+
+    Entries expire after TTL seconds and are treated as stale as soon as
+    os.environ, or the mtime of the working directory or of any path named in
+    the command, differs from when the command was run. Only commands that exit
+    with 0 are cached.
+    """
+
+    TTL = 60.0
+    MAX_ENTRIES = 128
+
+    def __init__(self):
+        self._entries: OrderedDict[tuple[str, str, str, bool], tuple[float, tuple, CodeOutput]] = OrderedDict()
+
+    @staticmethod
+    def fingerprint(command: str, working_dir: str) -> tuple:
+        """Environment hash plus mtimes of the working directory and of every command word that resolves to a path"""
+        lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+        lexer.whitespace_split = True  # Split "cat f;" into "cat", "f", ";"
+        try:
+            words = list(lexer)
+        except ValueError:
+            words = []
+        stamps: list = [ShellPool._environ_fingerprint()]
+        for path in dict.fromkeys([working_dir, *(os.path.join(working_dir, word) for word in words)]):
+            try:
+                stamps.append((path, os.stat(path).st_mtime_ns))
+            except (OSError, ValueError):
+                stamps.append((path, None))  # Still recorded so creating the path invalidates
+        return tuple(stamps)
+
+    def get(self, key: tuple[str, str, str, bool], fingerprint: tuple) -> Optional[CodeOutput]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, stored_fingerprint, output = entry
+        if time.monotonic() - stored_at >= self.TTL or stored_fingerprint != fingerprint:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return output
+
+    def put(self, key: tuple[str, str, str, bool], fingerprint: tuple, output: CodeOutput) -> None:
+        self._entries[key] = (time.monotonic(), fingerprint, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+
 class ShellTool(BaseTool):
     """Execute shell commands with automatic async mode for long-running commands.
 
@@ -57,7 +391,7 @@ class ShellTool(BaseTool):
        - Use shell_status tool to check progress
        Example:
        ```
-       Task started with ID: 1234-5678-90
+       Task started with ID: t1a
        Use shell_status with this task ID to check progress.
        ```
 
@@ -70,13 +404,27 @@ class ShellTool(BaseTool):
 
     2. Working Directory:
        - If unspecified, defaults to user's home directory
-       - Must exist or command will fail with error
+       - Relative paths are resolved against the server's current directory
+       - Must exist or command will fail with error: a new shell's chdir
+         failure is reported as a failed task ("Working directory does not
+         exist", return value -1); a reused pooled shell reports its own
+         "cd: ... No such file or directory" with a non-zero return value
        - Persists only for the single command
 
     3. Shell Selection:
        - Defaults to 'bash'
        - Available shells: bash, sh, zsh
-       - Each command runs in a fresh shell instance
+       - Each command runs in a fresh (sub)shell; cd, export etc. never carry over
+       - Simple commands reuse a pooled shell process to skip shell startup.
+         They run as `( cd -- '<dir>' && eval '<command>' )` with stdin from
+         /dev/null, so unlike `<shell> -c`:
+         - syntax errors read "<shell>: eval: line N: ..." where N grows over
+           the pooled shell's lifetime
+         - a command killed by signal N returns 128+N (e.g. 134 for SIGABRT)
+           rather than -N, and the shell may add a line such as "Aborted" to
+           stderr
+       - Commands using kill, pkill, killall, nohup, setsid, disown, $$,
+         $PPID or a background & always get a brand new `<shell> -c` process
     
     4. Background Operation:
        - Long commands run fully in background
@@ -87,6 +435,14 @@ class ShellTool(BaseTool):
        - Always check return value for non-zero exit codes
        - stderr may contain important messages even on success
        - Failed commands include error details in stderr
+       - merge_stderr=true interleaves stderr into Standard Output instead
+
+    6. Caching:
+       - Pass cache=true for read-only commands (git status, ls, cat ...)
+       - A repeat within 60 seconds returns the earlier output without
+         running anything, marked "[cached]" next to the execution time
+       - Changes to the environment, the working directory or files named in
+         the command invalidate the entry; only zero exit codes are cached
 
     # Common Patterns
     1. Quick Command:
@@ -102,20 +458,21 @@ class ShellTool(BaseTool):
        status = await shell_status.execute({"task_id": task_id})
        # Check status after a few seconds
        ```
+
+    # Subprocess Reaping
+    On Linux with Python 3.11 the default child watcher starts a thread per
+    subprocess to wait for it. The first command installs a PidfdChildWatcher
+    instead (when the kernel supports pidfd_open), so child exits are picked up
+    by the event loop's selector. Python 3.12+ already does this by default.
     """
 
     SYNC_TIMEOUT = 4.9  # Switch to async mode if command doesn't complete within 5 seconds
+    MAX_TASKS = 256  # Finished tasks beyond this are evicted, least recently used first
+    USE_POOL = True  # Run commands in reusable shells when ShellPool accepts them
 
-    def __init__(self):
-        self.tasks: Dict[str, ShellTask] = {}
-
-    @property
-    def name(self) -> str:
-        return "shell"
+    name = "shell"
 
-    @property
-    def description(self) -> str:
-        return """Execute shell commands with automatic async fallback.
+    description = """Execute shell commands with automatic async fallback.
 
 If the command completes within 5 seconds, you'll get the result immediately.
 If it takes longer, you'll get a task ID that you can use to check status with shell_status.
@@ -127,31 +484,44 @@ Example responses:
    Return Value: 0
 
 2. Long-running command:
-   Task started with ID: 1234-5678-90
+   Task started with ID: t1a
    Use shell_status with this task ID to check progress."""
 
-    @property
-    def schema(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "shell": {
-                    "type": "string",
-                    "description": "Shell to use (bash/sh/zsh)",
-                    "default": "bash",
-                    "enum": ["bash", "sh", "zsh"]
-                },
-                "working_dir": {
-                    "type": "string",
-                    "description": "Working directory to execute the command in (defaults to user home)"
-                },
-                "command": {
-                    "type": "string",
-                    "description": "Shell command to execute"
-                }
+    schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "shell": {
+                "type": "string",
+                "description": "Shell to use (bash/sh/zsh)",
+                "default": "bash",
+                "enum": ["bash", "sh", "zsh"]
             },
-            "required": ["command"]
-        }
+            "working_dir": {
+                "type": "string",
+                "description": "Working directory to execute the command in (defaults to user home)"
+            },
+            "command": {
+                "type": "string",
+                "description": "Shell command to execute"
+            },
+            "merge_stderr": {
+                "type": "boolean",
+                "description": "Send stderr to stdout through one pipe, interleaved in the order written",
+                "default": False
+            },
+            "cache": {
+                "type": "boolean",
+                "description": "Reuse the output of an identical recent command instead of running it (idempotent commands only)",
+                "default": False
+            }
+        },
+        "required": ["command"]
+    })
+
+    def __init__(self):
+        self.tasks: OrderedDict[str, ShellTask] = OrderedDict()
+        self.pool = ShellPool()
+        self.cache = CommandCache()
 
     async def execute(self, arguments: dict) -> List[types.TextContent]:
         command = arguments.get("command")
@@ -159,98 +529,148 @@ Example responses:
             raise ValueError("Missing command parameter")
 
         shell = arguments.get("shell", "bash")
-        working_dir = arguments.get("working_dir", str(pathlib.Path.home()))
-
-        # Verify working directory exists
-        if working_dir and not os.path.exists(working_dir):
-            raise ValueError(f"Working directory does not exist: {working_dir}")
+        # Absolute so the pool key and the pooled shell's cd agree with the spawn cwd
+        working_dir = os.path.abspath(arguments.get("working_dir", DEFAULT_WORKING_DIR))
+        merge_stderr = arguments.get("merge_stderr", False)
+
+        use_cache = arguments.get("cache", False)
+        if use_cache:
+            cache_key = (shell, working_dir, command, merge_stderr)
+            fingerprint = CommandCache.fingerprint(command, working_dir)
+            cached = self.cache.get(cache_key, fingerprint)
+            if cached is not None:
+                logger.info("Cache hit for command: %s", command)
+                return self._format_result(cached, cached=True)
 
         # Create task
-        task = ShellTask(command, shell, working_dir)
+        task = ShellTask(command, shell, working_dir, merge_stderr)
         self.tasks[task.id] = task
-        logger.info(f"Created task {task.id} for command: {command}")
+        self._evict_if_over()
+        logger.info("Created task %s for command: %s", task.id, command)
+
+        _ensure_child_watcher()
+
+        # Start the command once; the timeout below only stops waiting for it
+        bg_task = asyncio.create_task(self._execute_task(task.id))
+
+        if use_cache:
+            def store(done: asyncio.Task) -> None:
+                if not done.cancelled() and task.status == "completed" and task.result == 0:
+                    self.cache.put(cache_key, fingerprint, done.result())
+            bg_task.add_done_callback(store)
 
         try:
             # Try to execute synchronously with timeout
             result = await asyncio.wait_for(
-                self._execute_task(task.id),
+                asyncio.shield(bg_task),
                 timeout=self.SYNC_TIMEOUT
             )
 
             # If we get here, command completed within timeout
-            output_text = ""
-            if result.stdout:
-                output_text += f"Standard Output:\n{result.stdout}\n"
-            if result.stderr:
-                output_text += f"Standard Error:\n{result.stderr}\n"
-            output_text += f"Execution time: {result.execution_time:.4f} seconds\n"
-            output_text += f"Return Value:\n{result.result}"
-
-            return [types.TextContent(
-                type="text",
-                text=output_text
-            )]
+            return self._format_result(result)
 
         except asyncio.TimeoutError:
             # Command is taking too long, switch to async mode
-            logger.info(f"Command taking longer than {self.SYNC_TIMEOUT}s, switching to async mode")
-
-            # Make sure the task continues running in the background
-            asyncio.create_task(self._execute_task(task.id))
+            logger.info("Command taking longer than %ss, switching to async mode", self.SYNC_TIMEOUT)
 
+            # bg_task keeps running in the background; shell_status reads its progress
             return [types.TextContent(
                 type="text",
                 text=f"Task started with ID: {task.id}\nUse shell_status with this task ID to check progress."
             )]
 
+    async def close(self) -> None:
+        """Release pooled shells; called by the server on shutdown"""
+        await self.pool.close()
+
+    @staticmethod
+    def _format_result(result: CodeOutput, cached: bool = False) -> List[types.TextContent]:
+        parts: List[str] = []
+        if result.stdout:
+            parts.append(f"Standard Output:\n{result.stdout}\n")
+        if result.stderr:
+            parts.append(f"Standard Error:\n{result.stderr}\n")
+        marker = " [cached]" if cached else ""
+        parts.append(f"Execution time: {result.execution_time:.4f} seconds{marker}\n")
+        parts.append(f"Return Value:\n{result.result}")
+
+        return [types.TextContent(
+            type="text",
+            text="".join(parts)
+        )]
+
+    def _evict_if_over(self) -> None:
+        """Drop least recently used finished tasks until at most MAX_TASKS remain"""
+        excess = len(self.tasks) - self.MAX_TASKS
+        if excess <= 0:
+            return
+        stale = [task_id for task_id, task in self.tasks.items() if task.finished][:excess]
+        for task_id in stale:
+            del self.tasks[task_id]
+        logger.debug("Evicted %d finished tasks", len(stale))
+
     async def _execute_task(self, task_id: str) -> CodeOutput:
         task = self.tasks[task_id]
         output = CodeOutput()
         task.status = "running"
-        task.start_time = time.time()
+        task.start_time = time.monotonic()
 
         try:
-            logger.debug(f"Creating subprocess for task {task_id}")
-            task.process = await asyncio.create_subprocess_exec(
-                task.shell,
-                "-c",
-                task.command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=task.working_dir
-            )
-
-            logger.info(f"Process created with PID: {task.process.pid}")
-
-            # Wait for the command to complete and capture output
-            stdout, stderr = await task.process.communicate()
-
-            # Store results
-            output.stdout = stdout.decode() if stdout else ""
-            output.stderr = stderr.decode() if stderr else ""
-            output.result = task.process.returncode
+            if self.USE_POOL and ShellPool.accepts(task.command):
+                logger.debug("Running task %s in pooled shell", task_id)
+                task.result = await self.pool.run(task)
+            else:
+                task.result = await self._run_subprocess(task)
 
             # Update task status
-            task.stdout = output.stdout
-            task.stderr = output.stderr
-            task.result = output.result
             task.status = "completed"
-            task.execution_time = time.time() - task.start_time
+            task.execution_time = time.monotonic() - task.start_time
+
+            # Output shares the task's decoded strings rather than holding copies
+            output.stdout = task.stdout
+            output.stderr = task.stderr
+            output.result = task.result
             output.execution_time = task.execution_time
 
-            logger.info(f"Task {task_id} completed with return code: {task.result}")
+            logger.info("Task %s completed with return code: %s", task_id, task.result)
             if output.stderr:
-                logger.warning(f"Task {task_id} stderr output: {output.stderr}")
+                logger.warning("Task %s stderr output: %s", task_id, output.stderr)
 
         except Exception as e:
             error_msg = f"Error executing command: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            output.stderr = error_msg
-            task.stderr = error_msg
+            task.stderr_buf.extend(error_msg.encode("utf-8"))
             task.status = "failed"
-            task.execution_time = time.time() - task.start_time
+            output.stderr = task.stderr
+            task.execution_time = time.monotonic() - task.start_time
             output.execution_time = task.execution_time
             output.result = -1
             task.result = -1
 
         return output
+
+    async def _run_subprocess(self, task: ShellTask) -> int:
+        """Run task.command in a fresh shell, streaming into the task buffers; returns the exit status"""
+        logger.debug("Creating subprocess for task %s", task.id)
+        task.process = await _spawn_shell(
+            task.shell,
+            task.working_dir,
+            "-c",
+            task.command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT if task.merge_stderr else asyncio.subprocess.PIPE
+        )
+
+        logger.info("Process created with PID: %s", task.process.pid)
+
+        # Drain the pipes into the task buffers so shell_status sees partial output
+        readers = [asyncio.create_task(_drain(task.process.stdout, task.stdout_buf))]
+        if not task.merge_stderr:
+            readers.append(asyncio.create_task(_drain(task.process.stderr, task.stderr_buf)))
+        try:
+            await task.process.wait()
+            await asyncio.gather(*readers)
+        finally:
+            for reader in readers:
+                reader.cancel()
+        return task.process.returncode